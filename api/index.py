@@ -1,15 +1,34 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import time
+import asyncio
 import re
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import functools
+import itertools
 import logging
+import threading
+import atexit
+import tempfile
+import queue
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urljoin, urlparse, urlencode, parse_qsl
 import json
 
+# TTLCache lives at the project root, shared with app.py; running this file
+# directly only puts api/ on the path
+try:
+    from cache import TTLCache
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cache import TTLCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,13 +36,12 @@ logger = logging.getLogger(__name__)
 # Try importing selenium, if fails show clear error
 try:
     from selenium import webdriver
-    from selenium.webdriver.common.by import By
     from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
     from selenium.common.exceptions import TimeoutException, WebDriverException
     from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
     from webdriver_manager.core.os_manager import ChromeType
     SELENIUM_AVAILABLE = True
 except ImportError as e:
@@ -33,6 +51,132 @@ except ImportError as e:
     logger.error("=" * 60)
     SELENIUM_AVAILABLE = False
 
+# httpx lets the fallback path fetch match pages concurrently on one event loop
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# asgiref exposes the app to ASGI servers (uvicorn) so long scrapes run on
+# worker threads while the server keeps accepting requests
+try:
+    from asgiref.sync import SyncToAsync
+    from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+    ASGIREF_AVAILABLE = True
+except ImportError:
+    ASGIREF_AVAILABLE = False
+
+_BASE_URL = 'https://www.camel1.live'
+_HOME_URL = urljoin(_BASE_URL, '/home')
+
+# Precompiled patterns used on the scraping hot path
+_RE_MATCH_SLUG = re.compile(r'/match-([^/]+)')
+_RE_HREF_MATCH = re.compile(r'href=["\'](/game/match-[^"\']+)["\']')
+_RE_M3U8_ABS = re.compile(r'["\'](https?://[^"\']+\.m3u8[^"\']*)["\']')
+# Every m3u8 form in one pass: quoted absolute/root-relative URLs (group 1)
+# or any quoted value assigned to src/url (group 2)
+_RE_M3U8 = re.compile(
+    r'["\']((?:https?://|/)[^"\'<>]+\.m3u8[^"\'<>]*)["\']'
+    r'|(?:src|url)["\']?\s*[:=]\s*["\']([^"\'<>]+\.m3u8[^"\'<>]*)["\']',
+    re.IGNORECASE
+)
+_RE_M3U8_HINT = re.compile(r'\.m3u8', re.IGNORECASE)
+_M3U8_WINDOW = 500  # extra chars scanned around each .m3u8 occurrence
+# Any of the stream indicators, matched in one case-insensitive pass
+_RE_STREAM_HINT = re.compile(r'\.m3u8|\.mp4|stream|live|hls|video|embed', re.IGNORECASE)
+
+# Priority order: requested playlists > m3u8 > video elements > iframes > others
+_STREAM_PRIORITY = {
+    'network_log': 0,
+    'm3u8_pattern': 1,
+    'video_element': 2,
+    'iframe': 3,
+    'javascript': 4,
+    'data_attribute': 5
+}
+
+# Match links gathered in a single WebDriver call
+_JS_MATCH_HREFS = """
+const links = new Set();
+document.querySelectorAll('a[href]').forEach(a => {
+    if (a.href.indexOf('/game/') >= 0 || a.href.indexOf('/match-') >= 0) links.add(a.href);
+});
+document.querySelectorAll('[href*="/game/"], [href*="/match-"], .match-link, .game-link, '
+                          + '[class*="match"] a, [class*="game"] a').forEach(e => {
+    const href = e.href || e.getAttribute('href');
+    if (href) links.add(href);
+});
+return Array.from(links);
+"""
+
+# Every stream probe in one round-trip, as [source_type, url] pairs
+_JS_EXTRACT_STREAMS = r"""
+const out = [];
+const abs = u => { try { return new URL(u, document.baseURI).href; } catch (e) { return u; } };
+const add = (type, url) => { if (url && typeof url === 'string') out.push([type, abs(url)]); };
+
+const html = document.documentElement.innerHTML;
+// Same forms as _RE_M3U8: quoted absolute/root-relative URLs or any quoted
+// src/url value (relative paths resolve via abs()), then bare absolute URLs
+for (const m of html.matchAll(/["']((?:https?:\/\/|\/)[^"'<>]+\.m3u8[^"'<>]*)["']|(?:src|url)["']?\s*[:=]\s*["']([^"'<>]+\.m3u8[^"'<>]*)["']/gi))
+    add('m3u8_pattern', m[1] || m[2]);
+(html.match(/https?:\/\/[^"'<>\s]+\.m3u8[^"'<>\s]*/gi) || []).forEach(u => add('m3u8_pattern', u));
+// m3u8 always has top priority, so skip the DOM and window scans on a hit
+if (out.length) return out;
+document.querySelectorAll('video').forEach(v => {
+    add('video_element', v.src);
+    v.querySelectorAll('source').forEach(s => add('video_element', s.src));
+    add('video_element', v.currentSrc);
+});
+document.querySelectorAll('iframe').forEach(f => {
+    add('iframe', f.src);
+    add('iframe', f.getAttribute('data-src'));
+});
+try {
+    if (window.player) add('javascript', window.player.src);
+    add('javascript', Object.values(window).find(v => v && typeof v === 'string' && v.includes('.m3u8')));
+} catch (e) {}
+document.querySelectorAll('[data-src], [data-url], [data-stream]').forEach(e => {
+    ['data-src', 'data-url', 'data-stream'].forEach(a => add('data_attribute', e.getAttribute(a)));
+});
+return out;
+"""
+
+# Status, score and logos in one round-trip. Selectors are tried in priority
+# order in the browser, as the old per-selector WebDriver loops did
+_JS_MATCH_DETAILS = r"""
+const text = e => (e.innerText || '').trim();
+const statusSelectors = ['.status', '[class*="status"]', '[class*="live"]',
+                         '.live-indicator', '.match-status', '.time'];
+const scoreSelectors = ['.score', '[class*="score"]', '.goals', '.result',
+                        '.home-score', '.away-score'];
+let status = null;
+outer: for (const sel of statusSelectors) {
+    for (const e of document.querySelectorAll(sel)) {
+        const t = text(e);
+        if (t && t.length < 50) { status = t; break outer; }
+    }
+}
+let scores = null;
+for (const sel of scoreSelectors) {
+    const els = document.querySelectorAll(sel);
+    if (els.length >= 2) { scores = [text(els[0]), text(els[1])]; break; }
+}
+const logos = Array.from(document.images, i => i.src)
+    .filter(src => /\.(png|jpe?g|svg)/i.test(src)).slice(0, 2);
+return {status: status, scores: scores, logos: logos};
+"""
+
+# Page-ready conditions: the elements we actually scrape, not just <body>
+_JS_HOME_READY = "return !!document.querySelector('a[href*=\"/game/\"], a[href*=\"/match-\"]');"
+# Ad and widget iframes load early, so only stream-looking ones count
+_JS_MATCH_READY = """
+return !!(document.querySelector('video[src], video source[src], iframe[src*=".m3u8"], '
+                                 + 'iframe[src*="embed"], iframe[src*="stream"], iframe[src*="live"]')
+          || document.documentElement.innerHTML.indexOf('.m3u8') >= 0);
+"""
+
 app = Flask(__name__)
 CORS(app)
 
@@ -42,24 +186,286 @@ class Config:
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 5000))
     CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 300))  # 5 minutes
+    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', 256))  # entries
+    STALE_WINDOW = int(os.getenv('STALE_WINDOW', 600))  # seconds stale data is served while refreshing
     RATE_LIMIT = int(os.getenv('RATE_LIMIT', 1))  # requests per second
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))  # seconds
     ENABLE_SELENIUM = os.getenv('ENABLE_SELENIUM', 'True').lower() == 'true'
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))  # concurrent match pages
+    POOL_SIZE = int(os.getenv('POOL_SIZE', 4))  # warm Chrome drivers
+    MAX_USES_PER_INSTANCE = int(os.getenv('MAX_USES_PER_INSTANCE', 50))  # page loads before a driver is recycled
+    PAGE_WAIT_TIMEOUT = int(os.getenv('PAGE_WAIT_TIMEOUT', 6))  # seconds
+    # Answer cache misses with 202 + job id and scrape on a background thread.
+    # Needs a long-lived process; serverless hosts freeze threads after the response.
+    ASYNC_SCRAPE = os.getenv('ASYNC_SCRAPE', 'False').lower() == 'true'
 
 app.config.from_object(Config)
 
+# Shared HTTP session for the requests-based paths; keeps connections to
+# camel1.live alive across requests instead of handshaking on every call
+_HTTP = requests.Session()
+_HTTP.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+})
+_HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_HTTP_BACKOFF = 0.5  # seconds, doubled on each retry
+_HTTP.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=_HTTP_BACKOFF,
+        status_forcelist=_HTTP_RETRY_STATUSES,
+        allowed_methods=['GET'],
+        respect_retry_after_header=True
+    )
+))
+
+def get_session():
+    """Get the shared HTTP session"""
+    return _HTTP
+
+# Opportunistic probes (the match-page fast path) fail fast instead of
+# retrying: the browser path is the fallback for anything that goes wrong
+_HTTP_PROBE = requests.Session()
+_HTTP_PROBE.headers.update(_HTTP.headers)
+_HTTP_PROBE.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+_FAST_PATH_TIMEOUT = 5  # seconds
+
+# Pure string helpers, memoized: the same candidate URLs recur within a page
+# and across the home and match endpoints
+@functools.lru_cache(maxsize=2048)
+def _looks_like_stream(url):
+    """Check if URL looks like a stream"""
+    if not url or len(url) < 10:
+        return False
+    return _RE_STREAM_HINT.search(url) is not None
+
+@functools.lru_cache(maxsize=2048)
+def _teams_from_url(url):
+    """Extract team names from URL"""
+    try:
+        match = _RE_MATCH_SLUG.search(url)
+        if match:
+            teams = match.group(1).replace('-', ' ').title()
+            return teams
+    except:
+        pass
+    return "Unknown Match"
+
+# Query parameters that only track the referrer and never change the page
+_TRACKING_PARAMS = ('fbclid', 'gclid')
+
+def _match_cache_key(url):
+    """Cache key for a match page, shared by /api/match and /api/stream"""
+    parts = urlparse(url.strip())
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.startswith('utm_') and k not in _TRACKING_PARAMS
+    ])
+    normalized = parts._replace(
+        scheme=parts.scheme.lower(), netloc=parts.netloc.lower(), query=query, fragment=''
+    ).geturl()
+    return f"match:{normalized}"
+
+# The temp dir is the only writable path on serverless hosts and survives
+# warm restarts, so the resolved chromedriver is remembered there
+_DRIVER_PATH_FILE = os.path.join(tempfile.gettempdir(), '.chromedriver_path')
+_WDM_CACHE_DIR = os.path.join(tempfile.gettempdir(), '.wdm')
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def _chromedriver_path():
+    """Resolve chromedriver once, skipping webdriver-manager's version check when cached"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+        try:
+            with open(_DRIVER_PATH_FILE) as f:
+                path = f.read().strip()
+            if path and os.path.exists(path):
+                _driver_path = path
+                return path
+        except OSError:
+            pass
+        
+        path = ChromeDriverManager(cache_manager=DriverCacheManager(root_dir=_WDM_CACHE_DIR)).install()
+        try:
+            with open(_DRIVER_PATH_FILE, 'w') as f:
+                f.write(path)
+        except OSError as e:
+            logger.warning("Could not persist chromedriver path: %s", e)
+        _driver_path = path
+        return path
+
+def _forget_chromedriver_path(stale):
+    """Drop a persisted chromedriver path that no longer starts Chrome"""
+    global _driver_path
+    with _driver_path_lock:
+        # Another slot may already have re-resolved it
+        if _driver_path not in (None, stale):
+            return
+        _driver_path = None
+        try:
+            os.remove(_DRIVER_PATH_FILE)
+        except OSError:
+            pass
+
+class _MatchLinkScanner:
+    """Collect the first `limit` unique match hrefs from streamed HTML text chunks"""
+    def __init__(self, limit):
+        self.limit = limit
+        self.found = {}  # dict keeps the hrefs unique and in page order
+        self._buf = ''
+    
+    def feed(self, chunk):
+        """Scan one chunk; True once `limit` links have been found"""
+        self._buf += chunk
+        last_end = 0
+        for m in _RE_HREF_MATCH.finditer(self._buf):
+            self.found[m.group(1)] = None
+            last_end = m.end()
+            if len(self.found) >= self.limit:
+                return True
+        # Keep a short tail so an href split across chunks still matches
+        self._buf = self._buf[max(last_end, len(self._buf) - 256):]
+        return False
+
+def _scan_match_links(chunks, limit):
+    """Collect the first `limit` unique match hrefs from streamed HTML text chunks"""
+    scanner = _MatchLinkScanner(limit)
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return list(scanner.found)
+
 class RateLimiter:
+    """Token bucket allowing bursts of up to calls_per_second calls"""
     def __init__(self, calls_per_second=1):
         self.calls_per_second = calls_per_second
-        self.last_call = 0
+        self._tokens = float(calls_per_second)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self):
+        """Take a token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.calls_per_second,
+                self._tokens + (now - self._last) * self.calls_per_second
+            )
+            self._last = now
+            # Going negative queues callers behind each other without
+            # anyone sleeping while holding the lock
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.calls_per_second
     
     def wait(self):
-        now = time.time()
-        elapsed = now - self.last_call
-        wait_time = 1.0 / self.calls_per_second - elapsed
-        if wait_time > 0:
-            time.sleep(wait_time)
-        self.last_call = time.time()
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def wait_async(self):
+        """Awaitable wait() that does not block the event loop"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Resources no scrape reads; <img> elements and their src attributes stay
+# in the DOM, so logo extraction is unaffected
+_BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3',
+    '*.css',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+]
+
+class DriverPool:
+    """Bounded pool of reusable Chrome drivers, recycled after max_uses checkouts"""
+    def __init__(self, factory, size, max_uses):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = queue.Queue()
+        self._uses = {}  # live driver -> completed checkouts
+        self._count = 0  # live drivers plus ones being started
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout=30):
+        """Check out an idle driver, starting a new one while under the size cap"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            
+            with self._lock:
+                can_create = self._count < self.size
+                if can_create:
+                    self._count += 1
+            if can_create:
+                try:
+                    driver = self.factory()
+                except Exception:
+                    with self._lock:
+                        self._count -= 1
+                    raise
+                with self._lock:
+                    self._uses[driver] = 0
+                return driver
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No Chrome driver free after {timeout}s")
+            # Short waits so a slot freed by discard() is noticed too
+            try:
+                return self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+    
+    def release(self, driver):
+        """Return a healthy driver, clearing cookies and storage between uses"""
+        with self._lock:
+            uses = self._uses.get(driver, 0) + 1
+            self._uses[driver] = uses
+        if uses >= self.max_uses:
+            self.discard(driver)
+            return
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            # Drain the network log so the next page only sees its own requests
+            driver.get_log('performance')
+        except WebDriverException:
+            self.discard(driver)
+            return
+        self._idle.put(driver)
+    
+    def discard(self, driver):
+        """Quit a driver and free its slot, e.g. after it failed or aged out"""
+        with self._lock:
+            if self._uses.pop(driver, None) is None:
+                return
+            self._count -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def close(self):
+        """Quit every driver, idle or checked out"""
+        with self._lock:
+            drivers = list(self._uses)
+        for driver in drivers:
+            self.discard(driver)
 
 class CamelLiveScraper:
     def __init__(self):
@@ -83,14 +489,77 @@ class CamelLiveScraper:
         self.chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.chrome_options.add_experimental_option('useAutomationExtension', False)
         
+        # Skip resources the scraper never inspects; <img> src attributes
+        # stay in the DOM for logo extraction. JS stays on for injected streams.
+        self.chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        self.chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.images': 2,
+            'profile.managed_default_content_settings.stylesheets': 2,
+            'profile.default_content_setting_values.notifications': 2
+        })
+        # Return from driver.get() at DOMContentLoaded instead of full load
+        self.chrome_options.page_load_strategy = 'eager'
+        # Record network events so playlists fetched by player JS can be read back
+        self.chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        # Trim background services and per-process memory so warm drivers fit
+        # serverless memory limits
+        for arg in (
+            '--disable-background-networking',
+            '--disable-sync',
+            '--disable-default-apps',
+            '--disable-features=Translate,OptimizationHints,MediaRouter,'
+            'OptimizationGuideModelDownloading,site-per-process',
+            '--renderer-process-limit=2',
+            '--metrics-recording-only',
+            '--mute-audio',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--js-flags=--max-old-space-size=256',
+        ):
+            self.chrome_options.add_argument(arg)
+        
         self.rate_limiter = RateLimiter(calls_per_second=app.config['RATE_LIMIT'])
-        self.cache = {}
-        self.cache_timeout = timedelta(seconds=app.config['CACHE_TIMEOUT'])
+        # Entries past CACHE_TIMEOUT are still served for STALE_WINDOW seconds
+        # while a background refresh replaces them
+        self.cache = TTLCache(
+            maxsize=app.config['CACHE_MAX_SIZE'],
+            ttl=app.config['CACHE_TIMEOUT'],
+            max_age=app.config['CACHE_TIMEOUT'] + app.config['STALE_WINDOW']
+        )
+        self._cache_lock = threading.RLock()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+        # Cold-cache scrapes in progress; concurrent misses wait on the owner's event
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Set by /api/matches; the refresher idles when nobody is asking
+        self.last_matches_access = 0.0
         
         # Check if we're in Vercel environment
         self.is_vercel = 'VERCEL' in os.environ
         
+        # Warm drivers are checked out per page instead of starting Chrome
+        # each time; recycling after MAX_USES_PER_INSTANCE bounds memory growth
+        self.pool = DriverPool(
+            self.get_driver,
+            size=app.config['POOL_SIZE'],
+            max_uses=app.config['MAX_USES_PER_INSTANCE']
+        )
+        
+        # One worker per pooled driver, so fanned-out pages never queue on
+        # the pool; the semaphore caps concurrent page loads on the target site
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool.size,
+            thread_name_prefix='match-scraper'
+        )
+        self._host_semaphore = threading.Semaphore(app.config['MAX_WORKERS'])
+        
         logger.info("Setting up ChromeDriver...")
+        # Set when the service uses a resolved (and persisted) driver path
+        self._service_path = None
         try:
             if self.is_vercel:
                 # Vercel-specific setup
@@ -98,113 +567,239 @@ class CamelLiveScraper:
                 logger.info("✓ Using system ChromeDriver on Vercel")
             else:
                 # Local development setup
-                self.service = Service(ChromeDriverManager().install())
+                self._service_path = _chromedriver_path()
+                self.service = Service(self._service_path)
                 logger.info("✓ ChromeDriver ready!")
         except Exception as e:
-            logger.warning(f"Error with ChromeDriverManager: {e}")
+            logger.warning("Error with ChromeDriverManager: %s", e)
+            self._service_path = None
             try:
                 # Fallback to system Chrome
                 self.service = Service()
                 logger.info("✓ Using system ChromeDriver")
             except Exception as e2:
-                logger.error(f"All ChromeDriver setup failed: {e2}")
+                logger.error("All ChromeDriver setup failed: %s", e2)
                 raise
     
     def get_driver(self):
         """Create a new Chrome driver instance"""
         try:
-            driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
+            try:
+                driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
+            except WebDriverException as e:
+                stale = self._service_path
+                if stale is None:
+                    raise
+                # Chrome may have auto-updated past the cached driver; resolve
+                # the matching one once instead of failing on every pool slot
+                logger.warning("Chrome failed with cached chromedriver, re-resolving: %s", e)
+                _forget_chromedriver_path(stale)
+                path = _chromedriver_path()
+                if path == stale:
+                    raise
+                self._service_path = path
+                self.service = Service(path)
+                driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            try:
+                # Prefs only cover images and CSS; this also drops fonts,
+                # media and trackers before they hit the network
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                logger.warning("Could not set blocked URLs: %s", e)
             return driver
         except Exception as e:
-            logger.error(f"Error creating Chrome driver: {e}")
+            logger.error("Error creating Chrome driver: %s", e)
             raise
     
+    def quit_drivers(self):
+        """Quit every driver created by this scraper"""
+        self.pool.close()
+    
+    def get_cached(self, key):
+        """Get cached data, or None if missing or expired"""
+        with self._cache_lock:
+            return self.cache.get(key)
+    
     def get_cached_or_scrape(self, key, scraper_func, *args):
-        """Get from cache or scrape fresh data"""
-        now = datetime.now()
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if now - timestamp < self.cache_timeout:
-                logger.info(f"Using cached data for: {key}")
-                return data
-        
-        # Scrape fresh data
-        data = scraper_func(*args)
-        self.cache[key] = (data, now)
-        return data
+        """Get from cache or scrape fresh data, returning (data, cached)"""
+        with self._cache_lock:
+            entry = self.cache.get_entry(key)
+        if entry is not None:
+            data, is_fresh = entry
+            if is_fresh:
+                logger.debug("Using cached data for: %s", key)
+            else:
+                logger.debug("Using stale cached data for: %s", key)
+                self._start_refresh(key, scraper_func, args)
+            return data, True
+        
+        # Cold cache: nothing to serve, so scrape synchronously. Only the
+        # first caller scrapes; the rest wait for its result
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        
+        if not owner:
+            event.wait(timeout=app.config['REQUEST_TIMEOUT'])
+            data = self.get_cached(key)
+            if data is not None:
+                return data, True
+            # The owner failed or is too slow; scrape independently
+            return scraper_func(*args), False
+        
+        try:
+            data = scraper_func(*args)
+            with self._cache_lock:
+                self.cache[key] = data
+            return data, False
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            event.set()
+    
+    def _start_refresh(self, key, scraper_func, args):
+        """Refresh a stale cache entry in the background, once per key"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_executor.submit(self._background_refresh, key, scraper_func, args)
+    
+    def _background_refresh(self, key, scraper_func, args):
+        """Scrape fresh data for a cache key"""
+        try:
+            data = scraper_func(*args)
+            with self._cache_lock:
+                self.cache[key] = data
+            logger.info("Refreshed cached data for: %s", key)
+        except Exception as e:
+            logger.error("Background refresh failed for %s: %s", key, e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+    
+    def start_refresher(self):
+        """Keep home_matches warm from a daemon thread"""
+        threading.Thread(target=self._refresh_loop, name='home-refresher', daemon=True).start()
+    
+    def _refresh_loop(self):
+        """Re-scrape the homepage shortly before the cached copy goes stale"""
+        interval = max(10, app.config['CACHE_TIMEOUT'] - 30)
+        while True:
+            time.sleep(interval)
+            if time.monotonic() - self.last_matches_access > interval:
+                continue  # No requests last cycle; don't scrape for nobody
+            try:
+                data = self.scrape_home_matches()
+                with self._cache_lock:
+                    self.cache['home_matches'] = data
+                logger.info("Refreshed home_matches in the background")
+            except Exception as e:
+                logger.error("Background home refresh failed: %s", e)
+    
+    def _wait_for(self, driver, script, what):
+        """Wait until script returns true; scrape whatever loaded on timeout"""
+        try:
+            WebDriverWait(driver, app.config['PAGE_WAIT_TIMEOUT']).until(
+                lambda d: d.execute_script(script)
+            )
+        except TimeoutException:
+            logger.warning("Timed out waiting for %s, continuing with current page", what)
     
     def scrape_home_matches(self):
         """Scrape all matches from homepage"""
         if not app.config['ENABLE_SELENIUM']:
             return self._fallback_home_matches()
             
-        driver = None
         matches = []
         
         try:
             logger.info("Starting to scrape homepage...")
             
-            driver = self.get_driver()
-            logger.info("✓ Chrome driver created")
-            
-            logger.info("Loading https://www.camel1.live/home ...")
-            driver.get("https://www.camel1.live/home")
-            
-            # Use WebDriverWait instead of static sleep
-            wait = WebDriverWait(driver, 15)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-            logger.info(f"Page title: {driver.title}")
-            
-            # Look for match links with multiple strategies
-            match_links = self._find_match_links(driver)
-            logger.info(f"✓ Found {len(match_links)} match links")
+            driver = self.pool.acquire(timeout=app.config['REQUEST_TIMEOUT'])
+            logger.debug("✓ Chrome driver ready")
+            try:
+                logger.debug("Loading %s ...", _HOME_URL)
+                driver.get(_HOME_URL)
+                
+                self._wait_for(driver, _JS_HOME_READY, "match links")
+                
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Page title: %s", driver.title)
+                
+                # Look for match links with multiple strategies
+                match_links = self._find_match_links(driver)
+            except Exception:
+                self.pool.discard(driver)
+                raise
+            # Hand the driver back before fanning out so match pages can use it
+            self.pool.release(driver)
+            logger.info("✓ Found %d match links", len(match_links))
             
-            # Process matches with progress (limit to 5 for Vercel)
+            # Process matches concurrently (limit to 5 for Vercel)
             max_matches = 5 if self.is_vercel else len(match_links)
             match_links = match_links[:max_matches]
             
-            for i, link in enumerate(match_links, 1):
-                logger.info(f"[{i}/{len(match_links)}] Processing: {link}")
+            futures = {self._executor.submit(self.scrape_match_page, link): link for link in match_links}
+            results = {}
+            done = itertools.count(1)
+            for future in as_completed(futures):
+                link = futures[future]
+                logger.debug("[%d/%d] Processed: %s", next(done), len(match_links), link)
                 try:
-                    match_info = self.scrape_match_page(link)
-                    if match_info:
-                        matches.append(match_info)
-                        logger.info(f"  ✓ Match data extracted")
+                    results[link] = future.result()
+                    logger.debug("  ✓ Match data extracted")
+                    # Warm the per-match cache so follow-up /api/match and
+                    # /api/stream calls for these links are lookups; failed
+                    # pages are left for those calls to retry
+                    if 'error' not in results[link]:
+                        with self._cache_lock:
+                            self.cache[_match_cache_key(link)] = results[link]
                 except Exception as e:
-                    logger.error(f"  ✗ Error: {e}")
+                    logger.error("  ✗ Error: %s", e)
             
-            logger.info(f"Scraping complete! Found {len(matches)} matches with data")
+            # Keep the homepage order regardless of completion order
+            matches = [results[link] for link in match_links if results.get(link)]
+            
+            logger.info("Scraping complete! Found %d matches with data", len(matches))
             
         except Exception as e:
-            logger.error(f"Error in scrape_home_matches: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in scrape_home_matches: %s", e)
             # Fallback to requests-based scraping
             matches = self._fallback_home_matches()
-        finally:
-            if driver:
-                driver.quit()
-                logger.info("✓ Browser closed")
         
         return matches
     
-    def _fallback_home_matches(self):
+    @classmethod
+    def _fallback_home_matches(cls):
         """Fallback method using requests when Selenium fails"""
         logger.info("Using fallback scraping method...")
+        if HTTPX_AVAILABLE:
+            try:
+                return asyncio.run(cls._fallback_home_matches_async())
+            except Exception as e:
+                logger.warning("Async fallback scraping failed: %s", e)
+        
         try:
             # Simple requests-based scraping as fallback
-            response = requests.get('https://www.camel1.live/home', timeout=10)
+            # Transient 429/5xx and connection errors are retried by the session adapter
+            with get_session().get(_HOME_URL, stream=True,
+                                   timeout=app.config['REQUEST_TIMEOUT']) as response:
+                response.raise_for_status()
+                response.encoding = response.encoding or 'utf-8'
+                # Stop downloading once enough links are found
+                match_links = _scan_match_links(response.iter_content(chunk_size=8192, decode_unicode=True), 5)  # Limit for Vercel
             matches = []
             
-            # Extract match links from HTML
-            match_links = re.findall(r'href=["\'](/game/match-[^"\']+)["\']', response.text)
-            for link in match_links[:5]:  # Limit for Vercel
-                full_url = f"https://www.camel1.live{link}"
+            for link in match_links:
+                full_url = urljoin(_BASE_URL, link)
                 match_data = {
                     'match_url': full_url,
-                    'match_name': self._extract_teams_from_url(full_url),
+                    'match_name': cls._extract_teams_from_url(full_url),
                     'stream_url': None,
                     'fallback': True
                 }
@@ -212,60 +807,96 @@ class CamelLiveScraper:
             
             return matches
         except Exception as e:
-            logger.error(f"Fallback scraping failed: {e}")
+            logger.error("Fallback scraping failed: %s", e)
             return []
     
-    def _extract_teams_from_url(self, url):
+    @classmethod
+    async def _fallback_home_matches_async(cls):
+        """Fetch the homepage, then all of its match pages concurrently"""
+        # Caps in-flight requests to the site, as the connection limits do
+        semaphore = asyncio.Semaphore(10)
+        async with httpx.AsyncClient(
+            headers={'User-Agent': get_session().headers['User-Agent']},
+            timeout=app.config['REQUEST_TIMEOUT'],
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            follow_redirects=True
+        ) as client:
+            # Like the sync path, stop downloading once enough links are found
+            match_links = await cls._fetch_with_retry(client, semaphore, _HOME_URL, read=cls._read_match_links)
+            match_urls = [urljoin(_BASE_URL, link) for link in match_links]
+            pages = await asyncio.gather(
+                *(cls._fetch_with_retry(client, semaphore, url) for url in match_urls),
+                return_exceptions=True
+            )
+        
+        # Regex parsing stays synchronous once all pages are in
+        matches = []
+        for url, page in zip(match_urls, pages):
+            match_data = {
+                'match_url': url,
+                'match_name': cls._extract_teams_from_url(url),
+                'stream_url': None,
+                'fallback': True
+            }
+            if isinstance(page, Exception):
+                logger.warning("Fallback match page failed: %s: %s", url, page)
+            else:
+                match_data['stream_url'] = cls._find_fallback_stream(page)
+            matches.append(match_data)
+        return matches
+    
+    @staticmethod
+    async def _read_match_links(response, limit=5):  # Limit for Vercel
+        """Scan a streamed homepage for match links, stopping once enough are found"""
+        scanner = _MatchLinkScanner(limit)
+        async for chunk in response.aiter_text():
+            if scanner.feed(chunk):
+                break
+        return list(scanner.found)
+    
+    @staticmethod
+    async def _fetch_with_retry(client, semaphore, url, attempts=3, read=None):
+        """GET a page, retrying transient failures with exponential backoff
+        
+        The body is returned as text, or passed to the `read` coroutine as a
+        streamed response when given.
+        """
+        for attempt in range(attempts):
+            try:
+                async with semaphore:
+                    async with client.stream('GET', url) as response:
+                        if response.status_code not in _HTTP_RETRY_STATUSES:
+                            response.raise_for_status()
+                            if read is not None:
+                                return await read(response)
+                            await response.aread()
+                            return response.text
+                error = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+            if attempt < attempts - 1:
+                await asyncio.sleep(_HTTP_BACKOFF * 2 ** attempt)
+        raise error
+    
+    @staticmethod
+    def _extract_teams_from_url(url):
         """Extract team names from URL"""
-        try:
-            match = re.search(r'/match-([^/]+)', url)
-            if match:
-                teams = match.group(1).replace('-', ' ').title()
-                return teams
-        except:
-            pass
-        return "Unknown Match"
+        return _teams_from_url(url)
     
     def _find_match_links(self, driver):
         """Find all match links using multiple strategies"""
-        match_links = set()
-        
-        # Strategy 1: Find links containing '/game/'
-        all_links = driver.find_elements(By.TAG_NAME, 'a')
-        logger.info(f"Found {len(all_links)} total links on page")
-        
-        for link in all_links:
-            try:
-                href = link.get_attribute('href')
-                if href and ('/game/' in href or '/match-' in href):
-                    # Normalize URL
-                    if href.startswith('/'):
-                        href = f"https://www.camel1.live{href}"
-                    match_links.add(href)
-            except:
-                continue
+        # One WebDriver round-trip for every href instead of one per element
+        try:
+            hrefs = driver.execute_script(_JS_MATCH_HREFS) or []
+        except Exception as e:
+            logger.warning("Could not read links from page: %s", e)
+            hrefs = []
+        logger.debug("Found %d candidate links on page", len(hrefs))
         
-        # Strategy 2: Look for specific match elements
-        selectors = [
-            '[href*="/game/"]',
-            '[href*="/match-"]',
-            '.match-link',
-            '.game-link',
-            '[class*="match"] a',
-            '[class*="game"] a'
-        ]
-        
-        for selector in selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for elem in elements:
-                    href = elem.get_attribute('href')
-                    if href:
-                        if href.startswith('/'):
-                            href = f"https://www.camel1.live{href}"
-                        match_links.add(href)
-            except:
-                continue
+        # urljoin leaves absolute links alone and fixes relative/protocol-relative ones
+        match_links = {urljoin(_BASE_URL, href) for href in hrefs}
         
         return list(match_links)[:10]  # Limit for performance
     
@@ -274,78 +905,116 @@ class CamelLiveScraper:
         if not app.config['ENABLE_SELENIUM']:
             return self._fallback_match_page(url)
             
-        driver = None
+        # Most pages serve the m3u8 in the initial HTML; a plain GET is far
+        # cheaper than a Chrome page load, so only fall through when it misses
+        fast_data = self._try_fast_scrape(url)
+        if fast_data:
+            return fast_data
+        
         match_data = {'match_url': url}
+        driver = None
         
         try:
             self.rate_limiter.wait()
-            driver = self.get_driver()
+            driver = self.pool.acquire(timeout=app.config['REQUEST_TIMEOUT'])
             
-            logger.info(f"Loading match page: {url}")
-            driver.get(url)
+            logger.debug("Loading match page: %s", url)
+            with self._host_semaphore:
+                driver.get(url)
             
-            # Wait for page to load
-            wait = WebDriverWait(driver, 15)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            self._wait_for(driver, _JS_MATCH_READY, "stream elements")
             
             # Extract basic match info from URL
             self._extract_match_info_from_url(url, match_data)
             
-            # Get page source for analysis
-            page_source = driver.page_source
-            
-            # Enhanced stream URL extraction
-            stream_url = self.extract_stream_url_enhanced(driver, page_source, url)
+            stream_url = self.extract_stream_url_enhanced(driver, url)
             match_data['stream_url'] = stream_url
             
             # Extract additional match details
             self._extract_match_details(driver, match_data)
             
             if stream_url:
-                logger.info(f"✓ Stream found: {stream_url}")
+                logger.info("✓ Stream found: %s", stream_url)
             else:
-                logger.info(f"✗ No stream found")
+                logger.info("✗ No stream found")
             
         except Exception as e:
-            logger.error(f"Error in scrape_match_page: {e}")
+            logger.error("Error in scrape_match_page: %s", e)
             match_data['error'] = str(e)
+            if driver is not None:
+                self.pool.discard(driver)
+                driver = None
             # Try fallback
             fallback_data = self._fallback_match_page(url)
             if fallback_data:
                 match_data.update(fallback_data)
         finally:
-            if driver:
-                driver.quit()
+            if driver is not None:
+                self.pool.release(driver)
         
         return match_data
     
-    def _fallback_match_page(self, url):
+    def _try_fast_scrape(self, url):
+        """Scrape a match page over plain HTTP; None if no stream is in the HTML"""
+        # Still a request to the site, so it is throttled like a page load
+        self.rate_limiter.wait()
+        try:
+            with self._host_semaphore:
+                response = _HTTP_PROBE.get(url, timeout=min(_FAST_PATH_TIMEOUT, app.config['REQUEST_TIMEOUT']))
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.debug("Fast path failed for %s: %s", url, e)
+            return None
+        
+        # The site serves UTF-8; only trust requests' encoding when the server
+        # actually declared a charset, since it defaults text/html to latin-1
+        encoding = 'utf-8'
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            encoding = response.encoding or encoding
+        try:
+            html = response.content.decode(encoding, errors='replace')
+        except LookupError:  # unknown charset name in the header
+            html = response.content.decode('utf-8', errors='replace')
+        stream_url = self._select_best_stream(self._check_m3u8_sources(html, url))
+        if not stream_url:
+            return None
+        
+        match_data = {'match_url': url, 'stream_url': stream_url}
+        self._extract_match_info_from_url(url, match_data)
+        logger.info("✓ Stream found without browser: %s", stream_url)
+        return match_data
+    
+    @classmethod
+    def _fallback_match_page(cls, url):
         """Fallback match page scraping"""
         try:
-            response = requests.get(url, timeout=10)
+            response = get_session().get(url, timeout=app.config['REQUEST_TIMEOUT'])
             match_data = {
                 'match_url': url,
-                'match_name': self._extract_teams_from_url(url),
+                'match_name': cls._extract_teams_from_url(url),
                 'stream_url': None,
                 'fallback': True
             }
             
             # Try to find stream URL in page source
-            m3u8_pattern = r'["\'](https?://[^"\']+\.m3u8[^"\']*)["\']'
-            m3u8_matches = re.findall(m3u8_pattern, response.text)
-            if m3u8_matches:
-                match_data['stream_url'] = m3u8_matches[0]
+            match_data['stream_url'] = cls._find_fallback_stream(response.text)
             
             return match_data
         except Exception as e:
-            logger.error(f"Fallback match page failed: {e}")
+            logger.error("Fallback match page failed: %s", e)
             return None
     
+    @staticmethod
+    def _find_fallback_stream(html):
+        """Find the first absolute m3u8 URL in a page source"""
+        match = _RE_M3U8_ABS.search(html)
+        return match.group(1) if match else None
+    
     def _extract_match_info_from_url(self, url, match_data):
         """Extract match information from URL pattern"""
         try:
             # Extract from URL pattern like /game/match-team1-team2/video/abc123
-            match = re.search(r'/match-([^/]+)', url)
+            match = _RE_MATCH_SLUG.search(url)
             if match:
                 teams = match.group(1).replace('-', ' ').title()
                 match_data['match_name'] = teams
@@ -367,244 +1036,203 @@ class CamelLiveScraper:
                         match_data['home_team'] = ' '.join(words[:mid])
                         match_data['away_team'] = ' '.join(words[mid:])
         except Exception as e:
-            logger.warning(f"Could not extract match info from URL: {e}")
+            logger.warning("Could not extract match info from URL: %s", e)
     
     def _extract_match_details(self, driver, match_data):
         """Extract additional match details from page"""
         try:
-            # Status extraction
-            status_selectors = [
-                '.status', '[class*="status"]', '[class*="live"]', 
-                '.live-indicator', '.match-status', '.time'
-            ]
-            for selector in status_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for elem in elements:
-                        text = elem.text.strip()
-                        if text and len(text) < 50:  # Reasonable status length
-                            match_data['status'] = text
-                            break
-                    if 'status' in match_data:
-                        break
-                except:
-                    continue
-            
-            # Score extraction
-            score_selectors = [
-                '.score', '[class*="score"]', '.goals', '.result',
-                '.home-score', '.away-score'
-            ]
-            for selector in score_selectors:
-                try:
-                    scores = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if len(scores) >= 2:
-                        match_data['home_score'] = scores[0].text.strip()
-                        match_data['away_score'] = scores[1].text.strip()
-                        break
-                except:
-                    continue
-            
-            # Logo extraction
-            try:
-                logos = driver.find_elements(By.CSS_SELECTOR, "img")
-                logo_urls = []
-                for img in logos:
-                    try:
-                        src = img.get_attribute('src')
-                        if src and any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg', '.svg']):
-                            logo_urls.append(src)
-                    except:
-                        continue
-                
-                if len(logo_urls) >= 2:
-                    match_data['home_logo'] = logo_urls[0]
-                    match_data['away_logo'] = logo_urls[1]
-            except Exception as e:
-                logger.warning(f"Could not extract logos: {e}")
-                
+            details = driver.execute_script(_JS_MATCH_DETAILS) or {}
         except Exception as e:
-            logger.warning(f"Could not extract all match details: {e}")
-    
-    def extract_stream_url_enhanced(self, driver, page_source, page_url):
-        """Enhanced stream URL extraction with multiple methods"""
-        stream_sources = []
+            logger.warning("Could not extract all match details: %s", e)
+            return
         
-        # Method 1: Check video elements
-        video_src = self._check_video_elements(driver)
-        if video_src:
-            stream_sources.append(('video_element', video_src))
+        if details.get('status'):
+            match_data['status'] = details['status']
         
-        # Method 2: Check iframes
-        iframe_src = self._check_iframes(driver)
-        if iframe_src:
-            stream_sources.append(('iframe', iframe_src))
+        scores = details.get('scores')
+        if scores:
+            match_data['home_score'], match_data['away_score'] = scores
         
-        # Method 3: Check for m3u8 in page source
-        m3u8_sources = self._check_m3u8_sources(page_source, page_url)
-        stream_sources.extend(m3u8_sources)
+        logos = details.get('logos') or []
+        if len(logos) >= 2:
+            match_data['home_logo'], match_data['away_logo'] = logos[:2]
+    
+    def _probe_stream_sources(self, driver):
+        """Collect every in-page stream candidate in a single script call"""
+        try:
+            found = driver.execute_script(_JS_EXTRACT_STREAMS) or []
+        except Exception as e:
+            logger.warning("Stream probe failed: %s", e)
+            return []
         
-        # Method 4: Check JavaScript variables
-        js_sources = self._check_javascript_sources(driver)
-        stream_sources.extend(js_sources)
+        # The same URL is often found by several probes; score it once
+        return list(dict.fromkeys(
+            (source_type, url) for source_type, url in found if self._is_stream_url(url)
+        ))
+    
+    def _check_network_log(self, driver):
+        """m3u8 playlists the page actually requested, from the performance log"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug("Performance log unavailable: %s", e)
+            return []
         
-        # Method 5: Check data attributes
-        data_sources = self._check_data_attributes(driver)
-        stream_sources.extend(data_sources)
+        sources = []
+        for entry in entries:
+            message = entry.get('message', '')
+            # Cheap text check before decoding each event's JSON
+            if not _RE_M3U8_HINT.search(message):
+                continue
+            try:
+                event = json.loads(message)['message']
+                if event.get('method') != 'Network.requestWillBeSent':
+                    continue
+                url = event['params']['request']['url']
+            except (ValueError, KeyError, TypeError):
+                continue
+            if _RE_M3U8_HINT.search(url) and self._is_stream_url(url):
+                sources.append(('network_log', url))
+        return list(dict.fromkeys(sources))
+    
+    def extract_stream_url_enhanced(self, driver, page_url):
+        """Enhanced stream URL extraction with multiple methods"""
+        # Playlists loaded by XHR/fetch never appear in the DOM or source
+        network_sources = self._check_network_log(driver)
+        if network_sources:
+            return network_sources[0][1]
         
-        # Select the best stream source
-        best_stream = self._select_best_stream(stream_sources)
+        stream_sources = self._probe_stream_sources(driver)
         
-        logger.info(f"Found {len(stream_sources)} potential stream sources")
-        for source_type, url in stream_sources:
-            logger.info(f"  {source_type}: {url}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d potential stream sources", len(stream_sources))
+            for source_type, url in stream_sources:
+                logger.debug("  %s: %s", source_type, url)
         
-        return best_stream
-    
-    def _check_video_elements(self, driver):
-        """Check video elements for stream sources"""
-        try:
-            videos = driver.find_elements(By.TAG_NAME, 'video')
-            for video in videos:
-                # Check direct src
-                src = video.get_attribute('src')
-                if src and self._is_stream_url(src):
-                    return src
-                
-                # Check source tags
-                sources = video.find_elements(By.TAG_NAME, 'source')
-                for source in sources:
-                    src = source.get_attribute('src')
-                    if src and self._is_stream_url(src):
-                        return src
-                
-                # Check currentSrc via JavaScript
-                try:
-                    current_src = driver.execute_script("return arguments[0].currentSrc", video)
-                    if current_src and self._is_stream_url(current_src):
-                        return current_src
-                except:
-                    pass
-        except:
-            pass
-        return None
-    
-    def _check_iframes(self, driver):
-        """Check iframes for embedded streams"""
-        try:
-            iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-            for iframe in iframes:
-                src = iframe.get_attribute('src')
-                if src and self._is_stream_url(src):
-                    return src
-                
-                # Check for data-src or other attributes
-                data_src = iframe.get_attribute('data-src')
-                if data_src and self._is_stream_url(data_src):
-                    return data_src
-        except:
-            pass
-        return None
+        best_stream = self._select_best_stream(stream_sources)
+        if best_stream:
+            return best_stream
+        
+        # The probe already scans the DOM for every m3u8 form, so the whole
+        # page is serialized over the wire only when it finds nothing at all
+        return self._select_best_stream(self._check_m3u8_sources(driver.page_source, page_url))
     
     def _check_m3u8_sources(self, page_source, base_url):
         """Check page source for m3u8 URLs"""
         sources = []
         
-        # Pattern for m3u8 URLs
-        patterns = [
-            r'["\'](https?://[^"\'<>]+\.m3u8[^"\'<>]*)["\']',
-            r'["\'](/[^"\'<>]+\.m3u8[^"\'<>]*)["\']',
-            r'src["\']?\s*[:=]\s*["\']([^"\'<>]+\.m3u8[^"\'<>]*)["\']',
-            r'url["\']?\s*[:=]\s*["\']([^"\'<>]+\.m3u8[^"\'<>]*)["\']',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, page_source, re.IGNORECASE)
-            for match in matches:
-                if match.startswith('/'):
-                    # Convert relative URL to absolute
-                    match = urljoin(base_url, match)
-                if self._is_stream_url(match):
-                    sources.append(('m3u8_pattern', match))
-        
-        return sources
-    
-    def _check_javascript_sources(self, driver):
-        """Check JavaScript variables for stream URLs"""
-        sources = []
-        js_scripts = [
-            "return window.player && window.player.src",
-            "return document.querySelector('video') && document.querySelector('video').src",
-            "return Object.values(window).find(v => v && typeof v === 'string' && v.includes('.m3u8'))",
-        ]
+        # Most pages have no m3u8 at all, and those that do have it in a few
+        # spots; only scan merged windows around each occurrence. Windows are
+        # widened to the quotes enclosing the hit so long signed URLs are
+        # never cut, plus the usual margin before the opening quote for a
+        # src=/url: prefix.
+        spans = []
+        for hit in _RE_M3U8_HINT.finditer(page_source):
+            opening = max(page_source.rfind('"', 0, hit.start()),
+                          page_source.rfind("'", 0, hit.start()))
+            start = max(0, min(hit.start(), opening) - _M3U8_WINDOW)
+            closing = [i for i in (page_source.find('"', hit.end()),
+                                   page_source.find("'", hit.end())) if i != -1]
+            end = max(hit.end() + _M3U8_WINDOW, min(closing) + 1 if closing else len(page_source))
+            if spans and start <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
         
-        for script in js_scripts:
-            try:
-                result = driver.execute_script(script)
-                if result and self._is_stream_url(result):
-                    sources.append(('javascript', result))
-            except:
-                pass
+        for start, end in spans:
+            for m in _RE_M3U8.finditer(page_source, start, end):
+                # Convert relative URLs to absolute; absolute ones pass through
+                url = urljoin(base_url, m.group(1) or m.group(2))
+                if self._is_stream_url(url):
+                    sources.append(('m3u8_pattern', url))
         
         return sources
     
-    def _check_data_attributes(self, driver):
-        """Check data attributes for stream URLs"""
-        sources = []
-        try:
-            elements = driver.find_elements(By.CSS_SELECTOR, "[data-src], [data-url], [data-stream]")
-            for elem in elements:
-                for attr in ['data-src', 'data-url', 'data-stream']:
-                    value = elem.get_attribute(attr)
-                    if value and self._is_stream_url(value):
-                        sources.append(('data_attribute', value))
-        except:
-            pass
-        return sources
-    
     def _is_stream_url(self, url):
         """Check if URL looks like a stream"""
-        if not url or len(url) < 10:
-            return False
-        
-        stream_indicators = ['.m3u8', '.mp4', 'stream', 'live', 'hls', 'video', 'embed']
-        url_lower = url.lower()
-        
-        return any(indicator in url_lower for indicator in stream_indicators)
+        return _looks_like_stream(url)
     
     def _select_best_stream(self, stream_sources):
         """Select the best stream URL from available sources"""
         if not stream_sources:
             return None
         
-        # Priority order: m3u8 > video elements > iframes > others
-        priority = {
-            'm3u8_pattern': 1,
-            'video_element': 2,
-            'iframe': 3,
-            'javascript': 4,
-            'data_attribute': 5
-        }
-        
-        # Sort by priority
-        sorted_sources = sorted(stream_sources, key=lambda x: priority.get(x[0], 999))
-        
-        # Return the highest priority stream
-        return sorted_sources[0][1] if sorted_sources else None
+        # min() keeps the first of equal priority, as the stable sort did
+        return min(stream_sources, key=lambda x: _STREAM_PRIORITY.get(x[0], 999))[1]
 
 # Initialize scraper
 scraper = None
+_scraper_lock = threading.Lock()
 
 def get_scraper():
     """Get or initialize scraper instance"""
     global scraper
     if scraper is None and SELENIUM_AVAILABLE and app.config['ENABLE_SELENIUM']:
+        # Concurrent first requests would otherwise each build a scraper,
+        # and with it a driver pool and executors
+        with _scraper_lock:
+            if scraper is None:
+                try:
+                    scraper = CamelLiveScraper()
+                except Exception as e:
+                    logger.error("Failed to initialize scraper: %s", e)
+                    return None
+                # Registered once, for the singleton only
+                atexit.register(scraper.quit_drivers)
+                # Serverless hosts freeze threads between requests
+                if not scraper.is_vercel:
+                    scraper.start_refresher()
+    return scraper
+
+# Background scrape jobs: routes enqueue on a cache miss and return at once,
+# a single worker thread runs the scrape and fills the scraper cache
+_job_queue = queue.Queue()
+# Only finished jobs go in the bounded cache; queued and running ones are
+# tracked separately so LRU eviction never drops work still in progress
+_job_results = TTLCache(maxsize=64, ttl=app.config['CACHE_TIMEOUT'])
+_pending_jobs = {}  # cache key -> job id, so repeat misses share one job
+_pending_job_ids = set()
+_jobs_lock = threading.Lock()
+_job_worker = None
+
+def _run_jobs():
+    """Worker loop: scrape queued keys and record the outcome"""
+    while True:
+        job_id, key, scraper_instance, func, args = _job_queue.get()
         try:
-            scraper = CamelLiveScraper()
+            result, _ = scraper_instance.get_cached_or_scrape(key, func, *args)
+            outcome = {'status': 'done', 'result': result}
         except Exception as e:
-            logger.error(f"Failed to initialize scraper: {e}")
-            return None
-    return scraper
+            logger.error("Background job %s failed: %s", job_id, e)
+            outcome = {'status': 'error', 'error': str(e)}
+        with _jobs_lock:
+            _pending_jobs.pop(key, None)
+            _pending_job_ids.discard(job_id)
+            _job_results[job_id] = outcome
+        _job_queue.task_done()
+
+def enqueue_scrape(scraper_instance, key, func, *args):
+    """Queue a scrape for the background worker and return its job id"""
+    global _job_worker
+    with _jobs_lock:
+        if _job_worker is None:
+            _job_worker = threading.Thread(target=_run_jobs, name='scrape-jobs', daemon=True)
+            _job_worker.start()
+        job_id = _pending_jobs.get(key)
+        if job_id is None:
+            job_id = uuid.uuid4().hex
+            _pending_jobs[key] = job_id
+            _pending_job_ids.add(job_id)
+            _job_queue.put((job_id, key, scraper_instance, func, args))
+    return job_id
+
+def _job_accepted(job_id):
+    return jsonify({
+        'success': True,
+        'status': 'pending',
+        'job_id': job_id,
+        'poll': f'/api/jobs/{job_id}'
+    }), 202
 
 @app.route('/')
 def home():
@@ -621,6 +1249,7 @@ def home():
             '/api/stream': 'GET - Get stream URL only (requires ?url= parameter)',
             '/api/test': 'GET - Test if scraper is working',
             '/api/health': 'GET - Comprehensive health check',
+            '/api/jobs/<job_id>': 'GET - Poll a background scrape (ASYNC_SCRAPE mode)',
             '/api/status': 'GET - API status and configuration'
         }
     })
@@ -721,8 +1350,7 @@ def get_matches():
     try:
         if not SELENIUM_AVAILABLE or not app.config['ENABLE_SELENIUM']:
             # Use fallback method
-            fallback_scraper = CamelLiveScraper()
-            matches = fallback_scraper._fallback_home_matches()
+            matches = CamelLiveScraper._fallback_home_matches()
             return jsonify({
                 'success': True,
                 'count': len(matches),
@@ -739,22 +1367,26 @@ def get_matches():
                 'error': 'Scraper not available'
             }), 500
         
+        scraper_instance.last_matches_access = time.monotonic()
+        
+        if app.config['ASYNC_SCRAPE'] and scraper_instance.get_cached('home_matches') is None:
+            return _job_accepted(enqueue_scrape(scraper_instance, 'home_matches', scraper_instance.scrape_home_matches))
+        
         # Use cached version if available
-        matches = scraper_instance.get_cached_or_scrape('home_matches', scraper_instance.scrape_home_matches)
+        matches, cached = scraper_instance.get_cached_or_scrape('home_matches', scraper_instance.scrape_home_matches)
         
         return jsonify({
             'success': True,
             'count': len(matches),
             'matches': matches,
-            'cached': 'home_matches' in scraper_instance.cache,
+            'cached': cached,
             'fallback': False
         })
     except Exception as e:
-        logger.error(f"Error in /api/matches: {e}")
+        logger.error("Error in /api/matches: %s", e)
         # Try fallback
         try:
-            fallback_scraper = CamelLiveScraper()
-            matches = fallback_scraper._fallback_home_matches()
+            matches = CamelLiveScraper._fallback_home_matches()
             return jsonify({
                 'success': True,
                 'count': len(matches),
@@ -782,8 +1414,7 @@ def get_match():
     try:
         if not SELENIUM_AVAILABLE or not app.config['ENABLE_SELENIUM']:
             # Use fallback method
-            fallback_scraper = CamelLiveScraper()
-            match_data = fallback_scraper._fallback_match_page(url)
+            match_data = CamelLiveScraper._fallback_match_page(url)
             return jsonify({
                 'success': True,
                 'match': match_data,
@@ -799,22 +1430,22 @@ def get_match():
                 'error': 'Scraper not available'
             }), 500
         
-        # Use cache key based on URL
-        cache_key = f'match_{hash(url)}'
-        match_data = scraper_instance.get_cached_or_scrape(cache_key, scraper_instance.scrape_match_page, url)
+        cache_key = _match_cache_key(url)
+        if app.config['ASYNC_SCRAPE'] and scraper_instance.get_cached(cache_key) is None:
+            return _job_accepted(enqueue_scrape(scraper_instance, cache_key, scraper_instance.scrape_match_page, url))
+        match_data, cached = scraper_instance.get_cached_or_scrape(cache_key, scraper_instance.scrape_match_page, url)
         
         return jsonify({
             'success': True,
             'match': match_data,
-            'cached': cache_key in scraper_instance.cache,
+            'cached': cached,
             'fallback': False
         })
     except Exception as e:
-        logger.error(f"Error in /api/match: {e}")
+        logger.error("Error in /api/match: %s", e)
         # Try fallback
         try:
-            fallback_scraper = CamelLiveScraper()
-            match_data = fallback_scraper._fallback_match_page(url)
+            match_data = CamelLiveScraper._fallback_match_page(url)
             return jsonify({
                 'success': True if match_data else False,
                 'match': match_data,
@@ -841,8 +1472,7 @@ def get_stream():
     try:
         if not SELENIUM_AVAILABLE or not app.config['ENABLE_SELENIUM']:
             # Use fallback method
-            fallback_scraper = CamelLiveScraper()
-            match_data = fallback_scraper._fallback_match_page(url)
+            match_data = CamelLiveScraper._fallback_match_page(url)
             return jsonify({
                 'success': True,
                 'stream_url': match_data.get('stream_url') if match_data else None,
@@ -859,23 +1489,24 @@ def get_stream():
                 'error': 'Scraper not available'
             }), 500
         
-        # Use cache key based on URL
-        cache_key = f'stream_{hash(url)}'
-        match_data = scraper_instance.get_cached_or_scrape(cache_key, scraper_instance.scrape_match_page, url)
+        # Same key as /api/match, so either endpoint warms the other
+        cache_key = _match_cache_key(url)
+        if app.config['ASYNC_SCRAPE'] and scraper_instance.get_cached(cache_key) is None:
+            return _job_accepted(enqueue_scrape(scraper_instance, cache_key, scraper_instance.scrape_match_page, url))
+        match_data, cached = scraper_instance.get_cached_or_scrape(cache_key, scraper_instance.scrape_match_page, url)
         
         return jsonify({
             'success': True,
             'stream_url': match_data.get('stream_url'),
             'match_url': url,
-            'cached': cache_key in scraper_instance.cache,
+            'cached': cached,
             'fallback': False
         })
     except Exception as e:
-        logger.error(f"Error in /api/stream: {e}")
+        logger.error("Error in /api/stream: %s", e)
         # Try fallback
         try:
-            fallback_scraper = CamelLiveScraper()
-            match_data = fallback_scraper._fallback_match_page(url)
+            match_data = CamelLiveScraper._fallback_match_page(url)
             return jsonify({
                 'success': True if match_data else False,
                 'stream_url': match_data.get('stream_url') if match_data else None,
@@ -889,6 +1520,26 @@ def get_stream():
                 'error': f"Main: {str(e)}, Fallback: {str(fallback_error)}"
             }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a background scrape started in ASYNC_SCRAPE mode"""
+    with _jobs_lock:
+        pending = job_id in _pending_job_ids
+        job = None if pending else _job_results.get(job_id)
+    
+    if pending:
+        return jsonify({'success': True, 'status': 'pending', 'job_id': job_id}), 202
+    
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+    
+    if job['status'] == 'error':
+        return jsonify({'success': False, 'status': 'error', 'job_id': job_id, 'error': job['error']}), 500
+    return jsonify({'success': True, 'status': 'done', 'job_id': job_id, 'result': job['result']})
+
 # Vercel compatibility
 @app.route('/api/vercel-test')
 def vercel_test():
@@ -905,6 +1556,27 @@ def handler(request, context):
     # This is required for Vercel to handle the request
     return app(request, context)
 
+# ASGI entry point: uvicorn api.index:asgi_app --workers 1
+asgi_app = None
+if ASGIREF_AVAILABLE:
+    # WsgiToAsgi runs every request on asgiref's single thread-sensitive
+    # executor, serializing them; run them on a pool sized like the gunicorn
+    # gthread setup instead
+    _asgi_executor = ThreadPoolExecutor(max_workers=app.config['POOL_SIZE'], thread_name_prefix='asgi')
+    
+    class _ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+        run_wsgi_app = SyncToAsync(
+            WsgiToAsgiInstance.__dict__['run_wsgi_app'].func,
+            thread_sensitive=False,
+            executor=_asgi_executor
+        )
+    
+    class _ThreadedWsgiToAsgi(WsgiToAsgi):
+        async def __call__(self, scope, receive, send):
+            await _ThreadedWsgiToAsgiInstance(self.wsgi_application)(scope, receive, send)
+    
+    asgi_app = _ThreadedWsgiToAsgi(app)
+
 # For local development
 if __name__ == '__main__':
     print("\n" + "=" * 60)
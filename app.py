@@ -1,49 +1,204 @@
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import re
 import os
-from datetime import datetime, timedelta
+import threading
+import itertools
+from datetime import datetime
 import logging
 from urllib.parse import urljoin
 import json
 
+from cache import TTLCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# orjson is optional; jsonify falls back to the stdlib encoder without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx (with h2) lets match pages share one multiplexed HTTP/2 connection;
+# without it they are fetched with the thread pool
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for http2=True
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# selectolax parses HTML in C for link and detail extraction; without it
+# the precompiled regexes below are used instead
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# pyahocorasick matches all stream indicators in one automaton pass; without
+# it _STREAM_INDICATOR_RE is used instead
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Precompiled patterns used on the scraping hot path
+_MATCH_LINK_RE = re.compile(r'href=["\'](?:https://www\.camel1\.live)?(/game/match-[^"\']+)["\']')
+_MATCH_ID_RE = re.compile(r'/match-([^/]+)')
+_TEAM_SEP_RE = re.compile(r' [Vv]s | [-–] ')
+# One pass over the page for every stream candidate; the matching group
+# tells us the source: 1-2 m3u8 strings, 3 video/source src, 4 iframe src
+_STREAM_RE = re.compile(
+    r'(?:src|url)=["\']([^"\']+\.m3u8[^"\']*)["\']'
+    r'|["\']((?:https?://|/)[^"\']+\.m3u8[^"\']*)["\']'
+    r'|<(?:video|source)[^>]*src=["\']([^"\']+)["\']'
+    r'|<iframe[^>]*src=["\']([^"\']+)["\']',
+    re.IGNORECASE
+)
+_STREAM_GROUP_PRIORITY = {1: 0, 2: 0, 3: 1, 4: 2}
+# Transient upstream failures retried by both the requests and httpx paths
+_RETRY_TOTAL = 2
+_RETRY_BACKOFF = 0.2  # seconds, doubled on each retry
+_RETRY_STATUSES = (502, 503, 504)
+_STREAM_INDICATORS = ('.m3u8', '.mpd', '.mp4', 'stream', 'live', 'hls', 'video', 'embed')
+_STREAM_INDICATOR_RE = re.compile('|'.join(map(re.escape, _STREAM_INDICATORS)), re.IGNORECASE)
+_DETAILS_RE = re.compile(
+    r'<(?:div|span)[^>]*class=["\'][^"\']*(?P<kind>status|live|score)[^"\']*["\'][^>]*>(?P<val>[^<]+)</',
+    re.IGNORECASE
+)
+
+def _build_stream_automaton():
+    """Build the Aho-Corasick automaton for stream indicators, if available"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for indicator in _STREAM_INDICATORS:
+        automaton.add_word(indicator, indicator)
+    automaton.make_automaton()
+    return automaton
+
+_STREAM_AUTOMATON = _build_stream_automaton()
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson"""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
 # Configuration
 class Config:
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
     CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 300))
+    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', 256))
+    STALE_WINDOW = int(os.getenv('STALE_WINDOW', 600))  # seconds stale data is served while refreshing
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 10))
+    MAX_HTML_BYTES = int(os.getenv('MAX_HTML_BYTES', 1500000))
+    ENABLE_HTTP2 = os.getenv('ENABLE_HTTP2', 'True').lower() == 'true'
 
 app.config.from_object(Config)
 
 class CamelLiveScraper:
     def __init__(self):
-        self.cache = {}
-        self.cache_timeout = timedelta(seconds=app.config['CACHE_TIMEOUT'])
+        # Entries past CACHE_TIMEOUT are still served for STALE_WINDOW seconds
+        # while a background refresh replaces them
+        self.cache = TTLCache(
+            maxsize=app.config['CACHE_MAX_SIZE'],
+            ttl=app.config['CACHE_TIMEOUT'],
+            max_age=app.config['CACHE_TIMEOUT'] + app.config['STALE_WINDOW']
+        )
+        # Guards the cache; match pages are scraped from worker threads
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml',
+            # Includes br when the brotli package is installed, since
+            # urllib3 can only decode what it advertises
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
         })
+        # Pooled keep-alive connections for the concurrent match page fetches,
+        # retrying transient upstream failures on the same connection pool
+        retry = Retry(
+            total=_RETRY_TOTAL,
+            backoff_factor=_RETRY_BACKOFF,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def get_cached_or_scrape(self, key, scraper_func, *args):
-        """Get from cache or scrape fresh data"""
-        now = datetime.now()
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if now - timestamp < self.cache_timeout:
+        """Get from cache or scrape fresh data, returning (data, cached)"""
+        with self._lock:
+            entry = self.cache.get_entry(key)
+        if entry is not None:
+            data, is_fresh = entry
+            if is_fresh:
                 logger.info(f"Using cached data for: {key}")
-                return data
+            else:
+                logger.info(f"Using stale cached data for: {key}")
+                self._start_refresh(key, scraper_func, args)
+            return data, True
         
+        # Cold cache: nothing to serve, so scrape synchronously
         data = scraper_func(*args)
-        self.cache[key] = (data, now)
-        return data
+        with self._lock:
+            self.cache[key] = data
+        return data, False
+    
+    def _start_refresh(self, key, scraper_func, args):
+        """Refresh a stale cache entry in a background thread, once per key"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._background_refresh,
+            args=(key, scraper_func, args),
+            daemon=True
+        ).start()
+    
+    def _background_refresh(self, key, scraper_func, args):
+        """Scrape fresh data for a cache key"""
+        try:
+            data = scraper_func(*args)
+            with self._lock:
+                self.cache[key] = data
+            logger.info(f"Refreshed cached data for: {key}")
+        except Exception as e:
+            logger.error(f"Background refresh failed for {key}: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+    
+    def get_match_data(self, url):
+        """Get match page data, shared by /api/match and /api/stream"""
+        return self.get_cached_or_scrape(f'match_data:{url}', self.scrape_match_page, url)
     
     def scrape_home_matches(self):
         """Scrape all matches from homepage using requests"""
@@ -51,33 +206,15 @@ class CamelLiveScraper:
         matches = []
         
         try:
-            response = self.session.get(
-                'https://www.camel1.live/home', 
-                timeout=app.config['REQUEST_TIMEOUT']
-            )
-            response.raise_for_status()
+            html = self._fetch_html('https://www.camel1.live/home')
             
             # Extract match links from HTML
-            match_links = self._extract_match_links(response.text)
+            match_links = self._extract_match_links(html)
             logger.info(f"Found {len(match_links)} match links")
             
-            # Process matches (limit for Vercel)
-            for i, link in enumerate(match_links[:5], 1):
-                logger.info(f"[{i}/{len(match_links[:5])}] Processing: {link}")
-                try:
-                    match_info = self.scrape_match_page(link)
-                    if match_info:
-                        matches.append(match_info)
-                        logger.info(f"  ✓ Match data extracted")
-                except Exception as e:
-                    logger.error(f"  ✗ Error: {e}")
-                    # Add basic match info even if scraping fails
-                    matches.append({
-                        'match_url': link,
-                        'match_name': self._extract_teams_from_url(link),
-                        'stream_url': None,
-                        'error': str(e)
-                    })
+            # Process matches concurrently (extraction is limited for Vercel)
+            if match_links:
+                matches = self._scrape_match_pages(match_links)
             
             logger.info(f"Scraping complete! Found {len(matches)} matches")
             
@@ -92,77 +229,193 @@ class CamelLiveScraper:
         
         return matches
     
-    def _extract_match_links(self, html):
-        """Extract match links from homepage HTML"""
-        links = set()
+    def _scrape_match_pages(self, match_links):
+        """Scrape match pages concurrently, over HTTP/2 when httpx is available"""
+        if HTTPX_AVAILABLE and app.config['ENABLE_HTTP2']:
+            # Page failures come back as error entries; only setup failures
+            # (e.g. no usable event loop) reach the thread pool fallback
+            try:
+                return asyncio.run(self._scrape_match_pages_async(match_links))
+            except Exception as e:
+                logger.warning(f"HTTP/2 scraping failed, falling back to thread pool: {e}")
         
-        # Pattern for match URLs
-        patterns = [
-            r'href=["\'](/game/match-[^"\']+)["\']',
-            r'href=["\'](https://www\.camel1\.live/game/match-[^"\']+)["\']',
-        ]
+        with ThreadPoolExecutor(max_workers=len(match_links)) as executor:
+            results = executor.map(self._safe_scrape_match_page, match_links)
+            return [match_info for match_info in results if match_info]
+    
+    async def _scrape_match_pages_async(self, match_links):
+        """Fetch all match pages multiplexed over a single HTTP/2 connection"""
+        # The transport retries failed connections; _fetch_html_async retries
+        # the same statuses as the requests session
+        async with httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(http2=True, retries=_RETRY_TOTAL),
+            headers={
+                'User-Agent': self.session.headers['User-Agent'],
+                'Accept': self.session.headers['Accept']
+            },
+            timeout=app.config['REQUEST_TIMEOUT'],
+            follow_redirects=True
+        ) as client:
+            pages = await asyncio.gather(
+                *(self._fetch_html_async(client, link) for link in match_links),
+                return_exceptions=True
+            )
         
-        for pattern in patterns:
-            matches = re.findall(pattern, html)
-            for match in matches:
-                if match.startswith('/'):
-                    full_url = f"https://www.camel1.live{match}"
+        # Page parsing is CPU-bound, so it runs after all fetches complete
+        matches = []
+        for link, html in zip(match_links, pages):
+            try:
+                if isinstance(html, Exception):
+                    raise html
+                match_info = self._parse_match_page(link, html)
+                self._remember_match(link, match_info)
+            except Exception as e:
+                match_info = self._match_page_error(link, e)
+            matches.append(match_info)
+        return matches
+    
+    async def _fetch_html_async(self, client, url):
+        """Fetch a page with httpx, reading at most MAX_HTML_BYTES of it"""
+        limit = app.config['MAX_HTML_BYTES']
+        for attempt in range(_RETRY_TOTAL + 1):
+            async with client.stream('GET', url) as response:
+                if response.status_code in _RETRY_STATUSES and attempt < _RETRY_TOTAL:
+                    delay = self._retry_delay(response, attempt)
                 else:
-                    full_url = match
-                links.add(full_url)
+                    response.raise_for_status()
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= limit:
+                            break
+                    return self._decode_html(response, bytes(body[:limit]))
+            await asyncio.sleep(delay)
+    
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying, honoring Retry-After like urllib3"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(int(retry_after), app.config['REQUEST_TIMEOUT'])
+        return _RETRY_BACKOFF * 2 ** attempt
+    
+    def _safe_scrape_match_page(self, link):
+        """Scrape a match page, returning basic match info if scraping fails"""
+        logger.info(f"Processing: {link}")
+        try:
+            match_info = self.scrape_match_page(link)
+            if match_info:
+                logger.info(f"  ✓ Match data extracted: {link}")
+                self._remember_match(link, match_info)
+            return match_info
+        except Exception as e:
+            logger.error(f"  ✗ Error: {e}")
+            # Add basic match info even if scraping fails
+            return {
+                'match_url': link,
+                'match_name': self._extract_teams_from_url(link),
+                'stream_url': None,
+                'error': str(e)
+            }
+    
+    def _remember_match(self, link, match_info):
+        """Warm the per-match cache for follow-up /api/match calls"""
+        if 'error' not in match_info:
+            with self._lock:
+                self.cache[f'match_data:{link}'] = match_info
+    
+    def _extract_match_links(self, html, limit=5):
+        """Extract up to `limit` unique match links from homepage HTML"""
+        if SELECTOLAX_AVAILABLE:
+            paths = self._match_paths_from_dom(html)
+        else:
+            paths = (match.group(1) for match in _MATCH_LINK_RE.finditer(html))
         
+        # dict keeps the links unique and in page order
+        links = {}
+        for path in paths:
+            links[f"https://www.camel1.live{path}"] = None
+            if len(links) >= limit:
+                break
         return list(links)
     
+    def _match_paths_from_dom(self, html):
+        """Yield match page paths from anchors in the parsed homepage"""
+        for node in HTMLParser(html).css('a[href*="/game/match-"]'):
+            href = node.attributes.get('href') or ''
+            if href.startswith('https://www.camel1.live/'):
+                href = href[len('https://www.camel1.live'):]
+            if href.startswith('/game/match-'):
+                yield href
+    
     def scrape_match_page(self, url):
         """Scrape match page using requests"""
         logger.info(f"Scraping match page: {url}")
-        match_data = {'match_url': url}
-        
         try:
-            response = self.session.get(url, timeout=app.config['REQUEST_TIMEOUT'])
-            response.raise_for_status()
-            
-            # Extract match info from URL
-            self._extract_match_info_from_url(url, match_data)
-            
-            # Extract stream URL
-            stream_url = self._extract_stream_url(response.text, url)
-            match_data['stream_url'] = stream_url
-            
-            # Extract additional info from page
-            self._extract_match_details(response.text, match_data)
-            
-            if stream_url:
-                logger.info(f"✓ Stream found: {stream_url}")
-            else:
-                logger.info(f"✗ No stream found")
-                
+            html = self._fetch_html(url)
+            return self._parse_match_page(url, html)
         except Exception as e:
-            logger.error(f"Error scraping match page: {e}")
-            match_data['error'] = str(e)
-            # Ensure we have at least basic info
-            if 'match_name' not in match_data:
-                match_data['match_name'] = self._extract_teams_from_url(url)
+            return self._match_page_error(url, e)
+    
+    def _parse_match_page(self, url, html):
+        """Extract match data from a fetched match page"""
+        match_data = {'match_url': url}
+        
+        # Extract match info from URL
+        self._extract_match_info_from_url(url, match_data)
+        
+        # Extract stream URL
+        stream_url = self._extract_stream_url(html, url)
+        match_data['stream_url'] = stream_url
+        
+        # Extract additional info from page
+        self._extract_match_details(html, match_data)
+        
+        if stream_url:
+            logger.info(f"✓ Stream found: {stream_url}")
+        else:
+            logger.info(f"✗ No stream found")
         
         return match_data
     
+    def _match_page_error(self, url, error):
+        """Basic match info for a page that could not be scraped"""
+        logger.error(f"Error scraping match page: {error}")
+        return {
+            'match_url': url,
+            'match_name': self._extract_teams_from_url(url),
+            'error': str(error)
+        }
+    
+    def _fetch_html(self, url):
+        """Fetch a page, reading at most MAX_HTML_BYTES of it"""
+        # Streaming bounds decode and regex work however large the page is
+        with self.session.get(url, timeout=app.config['REQUEST_TIMEOUT'], stream=True) as response:
+            response.raise_for_status()
+            body = response.raw.read(app.config['MAX_HTML_BYTES'], decode_content=True)
+            return self._decode_html(response, body)
+    
+    def _decode_html(self, response, body):
+        """Decode a response body once, without charset sniffing"""
+        # The site serves UTF-8; only trust the client's guess when the
+        # server actually declared a charset
+        encoding = 'utf-8'
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            encoding = response.encoding or encoding
+        return body.decode(encoding, errors='replace')
+    
     def _extract_match_info_from_url(self, url, match_data):
         """Extract match information from URL pattern"""
         try:
-            match = re.search(r'/match-([^/]+)', url)
+            match = _MATCH_ID_RE.search(url)
             if match:
                 teams = match.group(1).replace('-', ' ').title()
                 match_data['match_name'] = teams
                 
                 # Try to split teams
-                separators = [' Vs ', ' vs ', ' - ', ' – ']
-                for sep in separators:
-                    if sep in teams:
-                        parts = teams.split(sep)
-                        if len(parts) == 2:
-                            match_data['home_team'] = parts[0].strip()
-                            match_data['away_team'] = parts[1].strip()
-                            break
+                parts = _TEAM_SEP_RE.split(teams, maxsplit=1)
+                if len(parts) == 2:
+                    match_data['home_team'] = parts[0].strip()
+                    match_data['away_team'] = parts[1].strip()
                 else:
                     # Fallback split
                     words = teams.split()
@@ -177,7 +430,7 @@ class CamelLiveScraper:
     def _extract_teams_from_url(self, url):
         """Extract team names from URL"""
         try:
-            match = re.search(r'/match-([^/]+)', url)
+            match = _MATCH_ID_RE.search(url)
             if match:
                 teams = match.group(1).replace('-', ' ').title()
                 return teams
@@ -187,71 +440,49 @@ class CamelLiveScraper:
     
     def _extract_stream_url(self, html, base_url):
         """Extract stream URL from page HTML"""
-        stream_sources = []
-        
-        # Look for m3u8 files
-        m3u8_patterns = [
-            r'["\'](https?://[^"\']+\.m3u8[^"\']*)["\']',
-            r'["\'](/[^"\']+\.m3u8[^"\']*)["\']',
-            r'src=["\']([^"\']+\.m3u8[^"\']*)["\']',
-            r'url=["\']([^"\']+\.m3u8[^"\']*)["\']',
-        ]
-        
-        for pattern in m3u8_patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            for match in matches:
-                if match.startswith('/'):
-                    full_url = urljoin(base_url, match)
-                else:
-                    full_url = match
-                if self._is_stream_url(full_url):
-                    stream_sources.append(full_url)
+        # First video element / iframe candidate, used if no m3u8 turns up
+        fallbacks = [None, None, None]
+        # Scheme and origin of the page, for resolving URLs without urljoin
+        scheme, _, rest = base_url.partition('://')
+        origin = f"{scheme}://{rest.split('/', 1)[0]}"
         
-        # Look for video elements
-        video_patterns = [
-            r'<video[^>]*src=["\']([^"\']+)["\'][^>]*>',
-            r'<source[^>]*src=["\']([^"\']+)["\'][^>]*>',
-        ]
+        for match in _STREAM_RE.finditer(html):
+            url = match.group(match.lastindex)
+            priority = _STREAM_GROUP_PRIORITY[match.lastindex]
+            # A video/iframe src pointing at a playlist is still an m3u8 hit
+            if priority and '.m3u8' in url.lower():
+                priority = 0
+            if fallbacks[priority] is not None:
+                continue
+            if url[0] == '/':
+                url = f"{scheme}:{url}" if url.startswith('//') else origin + url
+            elif url[0] == '.':
+                url = urljoin(base_url, url)
+            if self._is_stream_url(url):
+                # m3u8 has top priority, so stop scanning at the first one
+                if priority == 0:
+                    return url
+                fallbacks[priority] = url
         
-        for pattern in video_patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            for match in matches:
-                if match.startswith('/'):
-                    full_url = urljoin(base_url, match)
-                else:
-                    full_url = match
-                if self._is_stream_url(full_url):
-                    stream_sources.append(full_url)
-        
-        # Look for iframes
-        iframe_pattern = r'<iframe[^>]*src=["\']([^"\']+)["\'][^>]*>'
-        iframe_matches = re.findall(iframe_pattern, html, re.IGNORECASE)
-        for match in iframe_matches:
-            if self._is_stream_url(match):
-                stream_sources.append(match)
-        
-        # Return the first valid stream URL
-        return stream_sources[0] if stream_sources else None
+        return fallbacks[1] or fallbacks[2]
     
     def _extract_match_details(self, html, match_data):
         """Extract additional match details from HTML"""
         try:
-            # Extract status
-            status_patterns = [
-                r'<div[^>]*class=["\'][^"\']*status[^"\']*["\'][^>]*>([^<]+)</div>',
-                r'<span[^>]*class=["\'][^"\']*status[^"\']*["\'][^>]*>([^<]+)</span>',
-                r'<div[^>]*class=["\'][^"\']*live[^"\']*["\'][^>]*>([^<]+)</div>',
-            ]
+            if SELECTOLAX_AVAILABLE:
+                self._extract_match_details_from_dom(html, match_data)
+                return
             
-            for pattern in status_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    match_data['status'] = matches[0].strip()
+            # Status and scores come from a single pass over the page
+            score_matches = []
+            for match in _DETAILS_RE.finditer(html):
+                if match.group('kind').lower() == 'score':
+                    score_matches.append(match.group('val'))
+                elif 'status' not in match_data:
+                    match_data['status'] = match.group('val').strip()
+                if 'status' in match_data and len(score_matches) >= 2:
                     break
             
-            # Extract scores
-            score_pattern = r'<div[^>]*class=["\'][^"\']*score[^"\']*["\'][^>]*>([^<]+)</div>'
-            score_matches = re.findall(score_pattern, html, re.IGNORECASE)
             if len(score_matches) >= 2:
                 match_data['home_score'] = score_matches[0].strip()
                 match_data['away_score'] = score_matches[1].strip()
@@ -259,63 +490,99 @@ class CamelLiveScraper:
         except Exception as e:
             logger.warning(f"Could not extract match details: {e}")
     
+    def _extract_match_details_from_dom(self, html, match_data):
+        """Extract status and scores from the parsed page"""
+        tree = HTMLParser(html)
+        
+        # Only an element's own text counts, as with _DETAILS_RE: wrappers
+        # like .scoreboard would otherwise concatenate their children's text
+        statuses = self._own_texts(tree.css(
+            'div[class*="status"], span[class*="status"], div[class*="live"], span[class*="live"]'
+        ))
+        status = next(statuses, None)
+        if status:
+            match_data['status'] = status
+        
+        scores = list(itertools.islice(
+            self._own_texts(tree.css('div[class*="score"], span[class*="score"]')), 2
+        ))
+        if len(scores) == 2:
+            match_data['home_score'], match_data['away_score'] = scores
+    
+    def _own_texts(self, nodes):
+        """Yield the non-empty direct text of each node, skipping wrappers"""
+        for node in nodes:
+            text = node.text(deep=False, strip=True)
+            if text:
+                yield text
+    
     def _is_stream_url(self, url):
         """Check if URL looks like a stream"""
         if not url or len(url) < 10:
             return False
         
-        stream_indicators = ['.m3u8', '.mpd', '.mp4', 'stream', 'live', 'hls', 'video', 'embed']
-        url_lower = url.lower()
-        
-        return any(indicator in url_lower for indicator in stream_indicators)
+        if _STREAM_AUTOMATON is not None:
+            return next(_STREAM_AUTOMATON.iter(url.lower()), None) is not None
+        return _STREAM_INDICATOR_RE.search(url) is not None
 
 # Initialize scraper
 scraper = CamelLiveScraper()
 
+# Static payloads for the informational endpoints, serialized once without
+# the closing brace so each request only appends its timestamp
+_HOME_PAYLOAD_STATIC = {
+    'status': 'online',
+    'message': 'Camel Live Scraper API (Requests Version)',
+    'version': '1.0.0',
+    'environment': 'Vercel',
+    'endpoints': {
+        '/': 'GET - API information',
+        '/api/matches': 'GET - Get all matches from homepage',
+        '/api/match': 'GET - Get specific match details (add ?url=MATCH_URL)',
+        '/api/stream': 'GET - Get stream URL only (add ?url=MATCH_URL)',
+        '/api/health': 'GET - Health check'
+    },
+    'example': {
+        'get_matches': '/api/matches',
+        'get_match': '/api/match?url=https://www.camel1.live/game/match-example-team1-example-team2/video/abc123',
+        'get_stream': '/api/stream?url=https://www.camel1.live/game/match-example-team1-example-team2/video/abc123'
+    }
+}
+_HOME_JSON_TEMPLATE = json.dumps(_HOME_PAYLOAD_STATIC)[:-1]
+
+_HEALTH_PAYLOAD_STATIC = {
+    'status': 'healthy',
+    'environment': 'Vercel',
+    'method': 'requests'
+}
+_HEALTH_JSON_TEMPLATE = json.dumps(_HEALTH_PAYLOAD_STATIC)[:-1]
+
+def _timestamped_json(template):
+    """Complete a pre-serialized payload with the current local timestamp"""
+    body = f'{template},"timestamp":"{datetime.now().isoformat()}"}}'
+    return app.response_class(body, mimetype='application/json')
+
 @app.route('/')
 def home():
-    return jsonify({
-        'status': 'online',
-        'message': 'Camel Live Scraper API (Requests Version)',
-        'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0',
-        'environment': 'Vercel',
-        'endpoints': {
-            '/': 'GET - API information',
-            '/api/matches': 'GET - Get all matches from homepage',
-            '/api/match': 'GET - Get specific match details (add ?url=MATCH_URL)',
-            '/api/stream': 'GET - Get stream URL only (add ?url=MATCH_URL)',
-            '/api/health': 'GET - Health check'
-        },
-        'example': {
-            'get_matches': '/api/matches',
-            'get_match': '/api/match?url=https://www.camel1.live/game/match-example-team1-example-team2/video/abc123',
-            'get_stream': '/api/stream?url=https://www.camel1.live/game/match-example-team1-example-team2/video/abc123'
-        }
-    })
+    return _timestamped_json(_HOME_JSON_TEMPLATE)
 
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'environment': 'Vercel',
-        'method': 'requests'
-    })
+    return _timestamped_json(_HEALTH_JSON_TEMPLATE)
 
 @app.route('/api/matches', methods=['GET'])
 def get_matches():
     """Get all matches from homepage"""
     try:
-        matches = scraper.get_cached_or_scrape('home_matches', scraper.scrape_home_matches)
+        matches, cached = scraper.get_cached_or_scrape('home_matches', scraper.scrape_home_matches)
         
         return jsonify({
             'success': True,
             'count': len(matches),
             'matches': matches,
             'timestamp': datetime.now().isoformat(),
-            'cached': 'home_matches' in scraper.cache
+            'cached': cached
         })
     except Exception as e:
         logger.error(f"Error in /api/matches: {e}")
@@ -337,14 +604,13 @@ def get_match():
         }), 400
     
     try:
-        cache_key = f'match_{hash(url)}'
-        match_data = scraper.get_cached_or_scrape(cache_key, scraper.scrape_match_page, url)
+        match_data, cached = scraper.get_match_data(url)
         
         return jsonify({
             'success': True,
             'match': match_data,
             'timestamp': datetime.now().isoformat(),
-            'cached': cache_key in scraper.cache
+            'cached': cached
         })
     except Exception as e:
         logger.error(f"Error in /api/match: {e}")
@@ -366,15 +632,14 @@ def get_stream():
         }), 400
     
     try:
-        cache_key = f'stream_{hash(url)}'
-        match_data = scraper.get_cached_or_scrape(cache_key, scraper.scrape_match_page, url)
+        match_data, cached = scraper.get_match_data(url)
         
         return jsonify({
             'success': True,
             'stream_url': match_data.get('stream_url'),
             'match_url': url,
             'timestamp': datetime.now().isoformat(),
-            'cached': cache_key in scraper.cache
+            'cached': cached
         })
     except Exception as e:
         logger.error(f"Error in /api/stream: {e}")
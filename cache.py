@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """Size-bounded LRU cache; entries go stale after ttl and expire after max_age"""
+    def __init__(self, maxsize, ttl, max_age=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_age = max_age if max_age is not None else ttl
+        self._data = OrderedDict()
+        # Reads reorder or delete entries too, so every access is guarded
+        self._lock = threading.Lock()
+
+    def get_entry(self, key):
+        """Return (value, is_fresh) for an unexpired entry, else None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            age = time.monotonic() - stored_at
+            if age >= self.max_age:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, age < self.ttl
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def __setitem__(self, key, value):
+        # Reads and writes move keys to the end, so the least recently used
+        # entry is evicted first
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import unittest
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+import index  # noqa: E402
+
+BASE_URL = 'https://www.camel1.live/game/match-a-vs-b'
+
+
+def full_scan(page_source, base_url):
+    """Reference result: _RE_M3U8 over the whole page"""
+    sources = []
+    for m in index._RE_M3U8.finditer(page_source):
+        url = urljoin(base_url, m.group(1) or m.group(2))
+        if index._looks_like_stream(url):
+            sources.append(('m3u8_pattern', url))
+    return sources
+
+
+class CheckM3u8SourcesTest(unittest.TestCase):
+    def setUp(self):
+        # The check needs no browser state, so skip __init__ and its pool
+        self.scraper = index.CamelLiveScraper.__new__(index.CamelLiveScraper)
+
+    def test_url_longer_than_window(self):
+        url = 'https://cdn.example.com/live/index.m3u8?token=' + 'a' * 600
+        page = 'x' * 2000 + '<source src="%s">' % url + 'y' * 2000
+        self.assertEqual(self.scraper._check_m3u8_sources(page, BASE_URL),
+                         [('m3u8_pattern', url)])
+
+    def test_long_path_before_extension(self):
+        url = 'https://cdn.example.com/' + 'p/' * 400 + 'index.m3u8'
+        page = "var player = {url: '%s'};" % url
+        self.assertEqual(self.scraper._check_m3u8_sources(page, BASE_URL),
+                         [('m3u8_pattern', url)])
+
+    def test_matches_full_scan(self):
+        pieces = ['.m3u8', 'src=', 'url:', '"', "'", 'https://cdn.x/', '/hls/', ' ', '<div>']
+        alphabet = 'abc/ =:"\'<>.\n\t?&'
+        for seed in range(500):
+            rng = random.Random(seed)
+            parts = []
+            for _ in range(rng.randint(1, 60)):
+                roll = rng.random()
+                if roll < 0.4:
+                    parts.append(rng.choice(pieces))
+                elif roll < 0.7:
+                    parts.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 20))))
+                else:
+                    parts.append('x' * rng.randint(100, 1500))
+            page = ''.join(parts)
+            self.assertEqual(self.scraper._check_m3u8_sources(page, BASE_URL),
+                             full_scan(page, BASE_URL), msg='seed %d' % seed)
+
+
+if __name__ == '__main__':
+    unittest.main()